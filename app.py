@@ -7,12 +7,20 @@ and visually overlaying extracted information with bounding boxes and tooltips.
 
 import streamlit as st
 import streamlit.components.v1 as components
+import orjson
 import os
-import html as html_lib
+import hashlib
 import base64
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from typing import Optional, Dict, Any
 
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+import numpy as np
+from PIL import Image
+
 from dotenv import load_dotenv
 
 from logging_config import setup_logging, get_logger
@@ -80,19 +88,119 @@ def initialize_session_state():
     defaults = {
         "analysis_result": None,  # DocumentAnalysisResult
         "raw_result_dict": None,  # JSON dict
-        "document_images": None,
+        "page_box_index": None,  # {page_idx: {box_type: [box, ...]}}
         "selected_processor": None,
         "uploaded_file": None,
         "current_file_id": None,
         "current_page_idx": 0,
         "gcp_client": None,
-        "discovered_processors": None,
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
 
+# ------------------------------------------------------------------
+# Cached helpers
+# ------------------------------------------------------------------
+
+
+def _digest_bytes(data: bytes) -> bytes:
+    """Bounded-cost cache key for document bytes: prefix+suffix+length."""
+    digest = hashlib.blake2b(data[:65536], digest_size=16)
+    if len(data) > 65536:
+        digest.update(data[-65536:])
+    digest.update(len(data).to_bytes(8, "little"))
+    return digest.digest()
+
+
+@st.cache_data(max_entries=8, show_spinner=False, hash_funcs={bytes: _digest_bytes})
+def _page_count_cached(file_data: bytes, ext: str) -> int:
+    """Preview page count, cached per file (pdfinfo, no rasterization)."""
+    return DocumentProcessor.get_page_count(file_data, ext)
+
+
+@st.cache_data(max_entries=32, show_spinner=False, hash_funcs={bytes: _digest_bytes})
+def _render_page_cached(file_data: bytes, ext: str, page_idx: int):
+    """
+    Rasterize one page, cached per (file, page) across reruns.
+
+    Only the viewed page is ever converted, so opening a 10-page PDF costs
+    one page render instead of ten, and page navigation hits a warm cache
+    after the first visit. The custom hash keeps per-lookup cost bounded
+    instead of re-hashing the full upload each time.
+    """
+    return DocumentProcessor.render_page(file_data, ext, page_idx)
+
+
+@st.cache_resource(show_spinner=False)
+def _create_env_client() -> Optional[GCPDocumentAIClient]:
+    """Build the env/secrets-based client once and reuse it across reruns."""
+    return create_client_from_env()
+
+
+@st.cache_resource(show_spinner=False)
+def _annotator() -> SimpleDocumentAnnotator:
+    """One annotator per process so fonts/styles aren't rebuilt per rerun."""
+    return SimpleDocumentAnnotator()
+
+
+@st.cache_data(
+    ttl=300,
+    show_spinner=False,
+    hash_funcs={GCPDocumentAIClient: lambda c: c.endpoint},
+)
+def _list_processors_cached(client: GCPDocumentAIClient):
+    """
+    Discover processors, cached per endpoint with a 5-minute TTL.
+
+    Shared across sessions and reruns, so new browser sessions skip the
+    discovery RPC while still picking up newly created processors.
+    """
+    return client.list_processors()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def _encode_page_png(img_bytes: bytes, size: tuple, mode: str) -> str:
+    """
+    Base64-encode a page image as PNG, cached per pixel content.
+
+    PNG compression of a full page costs tens to hundreds of ms; zoom and
+    label toggles rescale in the browser, so the native-resolution encode
+    only ever needs to happen once per page. Raw pixel bytes are passed
+    instead of the PIL Image because the latter is not hashable.
+    """
+    image = Image.frombytes(mode, size, img_bytes)
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    # getbuffer avoids copying the encoded PNG before base64 reads it
+    return base64.b64encode(buffer.getbuffer()).decode("ascii")
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner=False)
+def _process_document_cached(
+    processor_id: str,
+    mime_type: str,
+    file_data: bytes,
+    options_json: Optional[str],
+) -> Dict[str, Any]:
+    """
+    Call process_document, cached per (processor, mime type, content, options).
+
+    Reprocessing the same file with the same processor becomes a cache hit
+    with no network round-trip. The client is pulled from session state
+    rather than passed in so it doesn't need to be hashable.
+    """
+    client = st.session_state.gcp_client
+    process_options = orjson.loads(options_json) if options_json else None
+    return client.process_document(
+        processor_id=processor_id,
+        document_data=file_data,
+        mime_type=mime_type,
+        process_options=process_options,
+    )
+
+
 # ------------------------------------------------------------------
 # Client creation
 # ------------------------------------------------------------------
@@ -100,7 +208,10 @@ def initialize_session_state():
 
 def create_gcp_client() -> Optional[GCPDocumentAIClient]:
     """Create GCP Document AI client from endpoint + service account JSON."""
-    client = create_client_from_env()
+    client = _create_env_client()
+    if client is None:
+        # Don't cache the failure — credentials may appear on a later rerun.
+        _create_env_client.clear()
 
     if client:
         return client
@@ -124,8 +235,7 @@ def create_gcp_client() -> Optional[GCPDocumentAIClient]:
 
     if endpoint and sa_json_str:
         try:
-            import json as _json
-            sa_info = _json.loads(sa_json_str)
+            sa_info = orjson.loads(sa_json_str)
             client = GCPDocumentAIClient(endpoint, sa_info)
             st.sidebar.success("Client created!")
             return client
@@ -190,23 +300,122 @@ def render_main_header():
 # ------------------------------------------------------------------
 
 
+# Width cap for plain (non-zoomable) st.image previews. The viewer column
+# is ~800 CSS px; shipping the full render width just makes the browser
+# do the downscale after paying for the larger payload.
+_PREVIEW_MAX_WIDTH = 1024
+
+
+def _fit_preview(image: Image.Image) -> Image.Image:
+    """Downscale a page to preview resolution for st.image display."""
+    if image.width <= _PREVIEW_MAX_WIDTH:
+        return image
+    ratio = _PREVIEW_MAX_WIDTH / image.width
+    return image.resize(
+        (_PREVIEW_MAX_WIDTH, max(1, round(image.height * ratio))),
+        Image.Resampling.LANCZOS,
+    )
+
+
+def _fingerprint_upload(uploaded_file, file_source: str) -> str:
+    """
+    Build a stable id for the upload without copying its buffer.
+
+    getbuffer() exposes the underlying BytesIO as a memoryview, so the id
+    costs a 128 KiB hash instead of materializing the whole file (up to
+    40 MB) on every rerun. The prefix+suffix digest also distinguishes
+    same-name, same-size files that differ in content.
+    """
+    name = getattr(uploaded_file, "name", "unknown")
+    if hasattr(uploaded_file, "getbuffer"):
+        try:
+            buf = uploaded_file.getbuffer()
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(buf[:65536])
+            if len(buf) > 65536:
+                digest.update(buf[-65536:])
+            return f"{name}_{len(buf)}_{digest.hexdigest()}_{file_source}"
+        except Exception:
+            pass
+    if hasattr(uploaded_file, "getvalue"):
+        try:
+            return f"{name}_{len(uploaded_file.getvalue())}_{file_source}"
+        except Exception:
+            pass
+    return f"{name}_{file_source}"
+
+
+def _read_file_data(uploaded_file) -> Optional[bytes]:
+    """
+    Return the upload's raw bytes, cached per file in session state.
+
+    Reruns triggered by page nav, zoom, or checkbox toggles reuse the bytes
+    already read for the current file instead of copying the whole upload
+    through Python again.
+    """
+    file_id = st.session_state.get("current_file_id")
+    cached = st.session_state.get("_file_bytes_cache")
+    if cached is not None and file_id is not None and cached[0] == file_id:
+        return cached[1]
+
+    if hasattr(uploaded_file, "getbuffer"):
+        # One copy, and getbuffer never advances the stream position.
+        file_data = bytes(uploaded_file.getbuffer())
+    elif hasattr(uploaded_file, "getvalue"):
+        file_data = uploaded_file.getvalue()
+    elif hasattr(uploaded_file, "read"):
+        uploaded_file.seek(0)
+        file_data = uploaded_file.read()
+    else:
+        return None
+
+    if file_id is not None:
+        st.session_state["_file_bytes_cache"] = (file_id, file_data)
+    return file_data
+
+
+def _build_page_index(bounding_boxes: Dict[str, list]) -> Dict[int, Dict[str, list]]:
+    """
+    Bucketize bounding boxes by page so reruns do an O(1) dict lookup
+    instead of re-scanning every box list on each page change.
+
+    Returns:
+        {page_idx: {box_type: [box, ...]}}
+    """
+    page_index: Dict[int, Dict[str, list]] = {}
+    for box_type, boxes in bounding_boxes.items():
+        for box in boxes:
+            page = box.get("page", 0)
+            page_index.setdefault(page, {}).setdefault(box_type, []).append(box)
+    return page_index
+
+
 def handle_document_analysis(
     client: GCPDocumentAIClient,
     processor_info: Dict[str, Any],
     file_data: bytes,
     mime_type: str,
+    file_ext: str = "pdf",
 ):
     """
     Run document processing and store results in session state.
 
+    While the API round-trip is in flight, preview rasterization is warmed
+    in a background thread so the total wait is max(api, rasterize) rather
+    than their sum.
+
     Args:
         client: GCP Document AI client
         processor_info: Dict with processor_id, processor_type, display_name
         file_data: Raw document bytes
         mime_type: MIME type of the document
+        file_ext: File extension used for the preview rasterization
     """
     processor_id = processor_info["processor_id"]
-    logger.info(f"Starting analysis with processor {processor_id}, mime={mime_type}, size={len(file_data)} bytes")
+    logger.info(
+        "Starting analysis with processor %s, mime=%s, size=%d bytes",
+        processor_id, mime_type, len(file_data),
+    )
 
     status_placeholder = st.empty()
 
@@ -227,51 +436,73 @@ def handle_document_analysis(
                     }
                 }
 
-            document_dict = client.process_document(
-                processor_id=processor_id,
-                document_data=file_data,
-                mime_type=mime_type,
-                process_options=process_options,
+            # Stable cache key for the options dict
+            options_json = (
+                orjson.dumps(process_options, option=orjson.OPT_SORT_KEYS).decode()
+                if process_options
+                else None
             )
 
+            # Warm the rasterization cache concurrently with the API call.
+            ctx = get_script_run_ctx()
+
+            def _warm_raster():
+                add_script_run_ctx(threading.current_thread(), ctx)
+                page_idx = st.session_state.get("current_page_idx") or 0
+                return _render_page_cached(file_data, file_ext, page_idx)
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                raster_future = executor.submit(_warm_raster)
+                document_dict = _process_document_cached(
+                    processor_id, mime_type, file_data, options_json
+                )
+                try:
+                    raster_future.result()
+                except Exception:
+                    # Preview rendering retries and surfaces any error itself.
+                    pass
+
             analysis = DocumentAnalysisResult(document_dict)
             st.session_state.analysis_result = analysis
             st.session_state.raw_result_dict = document_dict
+            st.session_state.page_box_index = _build_page_index(
+                analysis.get_bounding_boxes()
+            )
 
             status_placeholder.success("Document analysis completed successfully!")
 
-            # Summary metrics
+            # Summary metrics: a single markdown table instead of four
+            # st.metric widgets keeps the rerun payload to one element.
             if analysis.is_layout_parser_result():
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Pages", analysis.get_layout_page_count())
-                with col2:
-                    st.metric("Blocks", len(analysis.get_document_layout()))
-                with col3:
-                    st.metric("Chunks", len(analysis.get_chunked_document()))
-                with col4:
-                    text = analysis.get_text()
-                    char_count = len(text) if text else sum(
-                        len(b["text"]) for b in analysis.get_document_layout()
-                    )
-                    st.metric("Characters", char_count)
+                text = analysis.get_text()
+                char_count = len(text) if text else sum(
+                    len(b["text"]) for b in analysis.get_document_layout()
+                )
+                st.markdown(
+                    "| Pages | Blocks | Chunks | Characters |\n"
+                    "|---|---|---|---|\n"
+                    f"| {analysis.get_layout_page_count()} "
+                    f"| {len(analysis.get_document_layout())} "
+                    f"| {len(analysis.get_chunked_document())} "
+                    f"| {char_count} |"
+                )
             else:
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.metric("Pages", len(analysis.get_pages()))
-                with col2:
-                    st.metric("Tables", len(analysis.get_tables()))
-                with col3:
-                    st.metric("Form Fields", len(analysis.get_form_fields()))
-                with col4:
-                    st.metric("Entities", len(analysis.get_entities()))
+                st.markdown(
+                    "| Pages | Tables | Form Fields | Entities |\n"
+                    "|---|---|---|---|\n"
+                    f"| {len(analysis.get_pages())} "
+                    f"| {len(analysis.get_tables())} "
+                    f"| {len(analysis.get_form_fields())} "
+                    f"| {len(analysis.get_entities())} |"
+                )
 
         except Exception as e:
             error_msg = str(e)
-            logger.error(f"Document analysis failed: {error_msg}")
+            logger.error("Document analysis failed: %s", error_msg)
             status_placeholder.error(f"Analysis failed: {error_msg}")
             st.session_state.analysis_result = None
             st.session_state.raw_result_dict = None
+            st.session_state.page_box_index = None
 
             with st.expander("Error Details", expanded=True):
                 st.code(error_msg)
@@ -306,56 +537,186 @@ ELEMENT_INFO = {
 }
 
 
+# Precompiled escape table for tooltip text: str.translate runs the whole
+# scan in C, vs the chained str.replace passes inside html.escape.
+_HTML_ESCAPE_TABLE = str.maketrans({
+    "&": "&amp;",
+    "<": "&lt;",
+    ">": "&gt;",
+    '"': "&quot;",
+    "'": "&#x27;",
+})
+
+# Static HTML shell for the interactive viewer. Built once at import; per
+# rerun only the dynamic fields (container id, image data, display size)
+# are substituted instead of rebuilding the whole CSS/JS block.
+_VIEWER_HTML_PREFIX = '''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="utf-8">
+        <style>
+        body {{ margin: 0; padding: 10px; font-family: 'Source Sans Pro', sans-serif; }}
+        .annotation-overlay {{ transition: fill 0.2s ease; cursor: help; }}
+        .annotation-overlay:hover {{
+            fill: rgba(255,255,255,0.35);
+            stroke-width: 3;
+        }}
+        .custom-tooltip {{ word-wrap: break-word; white-space: normal; }}
+        #{container_id} {{ margin: 0 auto; display: block; }}
+        </style>
+    </head>
+    <body>
+        <div id="{container_id}" style="position:relative;display:inline-block;">
+            <img src="data:image/png;base64,{image_data}"
+                 style="display:block;width:{display_w}px;height:{display_h}px;border:1px solid #ddd;border-radius:5px;"
+                 alt="Document page {page_num}" />
+            <svg id="svg-{container_id}" viewBox="0 0 {img_w} {img_h}" preserveAspectRatio="none"
+                 style="position:absolute;left:0;top:0;width:{display_w}px;height:{display_h}px;">
+'''
+
+_VIEWER_HTML_SUFFIX = '''
+            </svg>
+            <div id="tooltip-{container_id}" class="custom-tooltip"
+                 style="position:absolute;background:rgba(0,0,0,0.9);color:white;padding:12px;
+                        border-radius:8px;font-size:13px;line-height:1.4;max-width:300px;
+                        pointer-events:none;z-index:1000;display:none;
+                        box-shadow:0 4px 12px rgba(0,0,0,0.3);">
+            </div>
+        </div>
+
+        <script>
+        document.addEventListener('DOMContentLoaded', function() {{
+            const container = document.getElementById('{container_id}');
+            const tooltip = document.getElementById('tooltip-{container_id}');
+            const svg = document.getElementById('svg-{container_id}');
+            if (!container || !tooltip || !svg) return;
+
+            // Delegated hover handling: one listener on the svg instead of
+            // per-rect listeners, which matters on dense OCR pages.
+            svg.addEventListener('mouseover', function(e) {{
+                const tc = e.target.getAttribute && e.target.getAttribute('data-tooltip');
+                if (tc) {{ tooltip.innerHTML = tc; tooltip.style.display = 'block'; }}
+            }});
+            svg.addEventListener('mousemove', function(e) {{
+                if (tooltip.style.display !== 'block') return;
+                const rect = container.getBoundingClientRect();
+                let x = e.clientX - rect.left + 10;
+                let y = e.clientY - rect.top - 10;
+                const tr = tooltip.getBoundingClientRect();
+                if (x + tr.width > rect.width) x = x - tr.width - 20;
+                if (y < 0) y = y + 30;
+                tooltip.style.left = x + 'px';
+                tooltip.style.top = y + 'px';
+            }});
+            svg.addEventListener('mouseout', function(e) {{
+                if (e.target.hasAttribute && e.target.hasAttribute('data-tooltip')) {{
+                    tooltip.style.display = 'none';
+                }}
+            }});
+        }});
+        </script>
+    </body>
+    </html>
+'''
+
+
+def _stack_normalized_vertices(boxes) -> np.ndarray:
+    """
+    Stack each box's normalized vertices into one (N, V, 2) float32 array.
+
+    Boxes with fewer vertices than the widest box are padded by repeating
+    their last vertex, which leaves min/max reductions unchanged.
+    Each box's vertices arrive as an (N, 2) float32 array from the client,
+    so rows are copied wholesale rather than element by element.
+    """
+    max_v = max(len(b["vertices"]) for b in boxes)
+    arr = np.empty((len(boxes), max_v, 2), dtype=np.float32)
+    for i, box in enumerate(boxes):
+        vertices = box["vertices"]
+        n = len(vertices)
+        arr[i, :n] = vertices
+        if n < max_v:
+            arr[i, n:] = vertices[-1]
+    return arr
+
+
 def _create_interactive_annotations(
-    image, bounding_boxes, page_idx, zoom_level=1.0
+    image, page_boxes, page_idx, zoom_level=1.0, rotate=False, viewport=None
 ):
     """
     Create HTML with interactive annotation overlays and rich tooltips.
 
     GCP uses normalized vertices (0-1), so pixel = vertex * image_dimension * zoom.
+    *page_boxes* is the pre-bucketized {box_type: [box, ...]} dict for this page.
+    When *rotate* is set, the 90° portrait/landscape correction is applied as a
+    broadcast op on the vertex array instead of mutating the boxes.
+    *viewport* optionally restricts emission to boxes intersecting a normalized
+    (x0, y0, x1, y1) rectangle, so DOM size scales with the visible area
+    rather than the page's total box count.
     """
-    buffer = BytesIO()
-    image.save(buffer, format="PNG")
-    image_data = base64.b64encode(buffer.getvalue()).decode()
-
-    # Filter for current page
-    page_boxes = {}
-    for box_type, boxes in bounding_boxes.items():
-        page_boxes[box_type] = [b for b in boxes if b.get("page", 0) == page_idx]
+    image_data = _encode_page_png(image.tobytes(), image.size, image.mode)
 
-    overlays_html = ""
+    # Accumulate overlay fragments in a list and join once at the end;
+    # repeated += on a growing string is quadratic for thousands of boxes.
+    overlay_parts: list = []
     container_id = f"doc-viewer-{page_idx}"
-    overlay_count = 0
+
+    # Hoist lookups out of the per-box loop; escaping goes through the
+    # precompiled translate table.
+    escape_table = _HTML_ESCAPE_TABLE
+
+    def html_escape(s: str) -> str:
+        return s.translate(escape_table)
+
+    append_overlay = overlay_parts.append
 
     img_w = image.width
     img_h = image.height
 
+    # Rect coordinates live in the SVG viewBox (native image pixels); the
+    # browser scales them through the svg width/height, so zoom changes
+    # never require recomputing coordinates in Python.
+    scale = np.array([img_w, img_h], dtype=np.float32)
+
     for box_type, boxes in page_boxes.items():
+        boxes = [b for b in boxes if len(b.get("vertices", [])) >= 3]
+        if not boxes:
+            continue
+
         info = ELEMENT_INFO.get(
             box_type, {"color": "#FF0000", "name": box_type.title()}
         )
         color = info["color"]
         type_name = info["name"]
 
-        for box in boxes:
-            vertices = box.get("vertices", [])
-            if len(vertices) < 3:
-                continue
-
-            # Convert normalized vertices to zoomed pixel coords
-            x_coords = [v["x"] * img_w * zoom_level for v in vertices]
-            y_coords = [v["y"] * img_h * zoom_level for v in vertices]
-
-            x_min = max(0, int(min(x_coords)))
-            y_min = max(0, int(min(y_coords)))
-            x_max = min(int(img_w * zoom_level), int(max(x_coords)))
-            y_max = min(int(img_h * zoom_level), int(max(y_coords)))
-
-            width = x_max - x_min
-            height = y_max - y_min
+        # Vectorized normalized -> zoomed-pixel conversion for the whole
+        # box group: one multiply plus min/max reductions in C instead of
+        # per-vertex Python arithmetic.
+        verts = _stack_normalized_vertices(boxes)
+        if rotate:
+            verts = np.stack([1.0 - verts[..., 1], verts[..., 0]], axis=-1)
+        xy = verts * scale
+        mins = np.maximum(xy.min(axis=1).astype(int), 0)
+        maxs = np.minimum(xy.max(axis=1).astype(int), scale.astype(int))
+        sizes = maxs - mins
+
+        # Cull boxes outside the visible viewport before emitting any HTML.
+        visible = None
+        if viewport is not None:
+            vp = np.asarray(viewport, dtype=np.float32) * np.concatenate([scale, scale])
+            visible = (
+                (maxs[:, 0] > vp[0]) & (mins[:, 0] < vp[2])
+                & (maxs[:, 1] > vp[1]) & (mins[:, 1] < vp[3])
+            )
 
+        for i, box in enumerate(boxes):
+            if visible is not None and not visible[i]:
+                continue
+            width, height = int(sizes[i, 0]), int(sizes[i, 1])
             if width <= 2 or height <= 2:
                 continue
+            x_min, y_min = int(mins[i, 0]), int(mins[i, 1])
 
             # Build tooltip content
             content = box.get("content", "").strip()
@@ -370,7 +731,7 @@ def _create_interactive_annotations(
                     content[:100] + "..." if len(content) > 100 else content
                 )
                 tooltip_lines.append(
-                    f"<div style='margin:5px 0;'><strong>Content:</strong><br>{html_lib.escape(display_content)}</div>"
+                    f"<div style='margin:5px 0;'><strong>Content:</strong><br>{html_escape(display_content)}</div>"
                 )
 
             if confidence < 1.0:
@@ -396,18 +757,18 @@ def _create_interactive_annotations(
                         )
                     if key_c and val_c:
                         tooltip_lines.append(
-                            f"<div style='font-size:0.9em;color:#666;'><strong>{html_lib.escape(key_c)}</strong> = {html_lib.escape(val_c)}</div>"
+                            f"<div style='font-size:0.9em;color:#666;'><strong>{html_escape(key_c)}</strong> = {html_escape(val_c)}</div>"
                         )
                 elif box_type == "entities":
                     etype = details.get("entityType", "")
                     norm = details.get("normalizedValue", "")
                     if etype:
                         tooltip_lines.append(
-                            f"<div style='font-size:0.9em;color:#666;'><strong>Type:</strong> {html_lib.escape(etype)}</div>"
+                            f"<div style='font-size:0.9em;color:#666;'><strong>Type:</strong> {html_escape(etype)}</div>"
                         )
                     if norm:
                         tooltip_lines.append(
-                            f"<div style='font-size:0.9em;color:#666;'><strong>Normalized:</strong> {html_lib.escape(norm)}</div>"
+                            f"<div style='font-size:0.9em;color:#666;'><strong>Normalized:</strong> {html_escape(norm)}</div>"
                         )
                 elif box_type == "checkboxes":
                     state = details.get("state", "unknown")
@@ -415,88 +776,34 @@ def _create_interactive_annotations(
                         f"<div style='font-size:0.9em;color:#666;'><strong>State:</strong> {state}</div>"
                     )
 
-            tooltip_content = "".join(tooltip_lines)
-            overlay_id = f"overlay-{overlay_count}"
-            overlay_count += 1
+            # Escape the assembled tooltip exactly once for the attribute;
+            # user-supplied content was already escaped as it was added.
+            tooltip_attr = html_escape("".join(tooltip_lines))
 
-            overlays_html += f'''
-            <div class="annotation-overlay"
-                 id="{overlay_id}"
-                 data-tooltip="{html_lib.escape(tooltip_content)}"
-                 style="position:absolute;left:{x_min}px;top:{y_min}px;width:{width}px;height:{height}px;
-                        border:2px solid {color};background:rgba(0,0,0,0.05);cursor:help;
-                        transition:all 0.2s ease;">
-            </div>'''
+            append_overlay(
+                f'<rect class="annotation-overlay" '
+                f'x="{x_min}" y="{y_min}" width="{width}" height="{height}" '
+                f'fill="rgba(0,0,0,0.05)" stroke="{color}" stroke-width="2" '
+                f'vector-effect="non-scaling-stroke" '
+                f'data-tooltip="{tooltip_attr}"/>'
+            )
 
     display_w = int(img_w * zoom_level)
     display_h = int(img_h * zoom_level)
 
-    html_content = f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="utf-8">
-        <style>
-        body {{ margin: 0; padding: 10px; font-family: 'Source Sans Pro', sans-serif; }}
-        .annotation-overlay {{ transition: all 0.2s ease; }}
-        .annotation-overlay:hover {{
-            background: rgba(255,255,255,0.3) !important;
-            border-width: 3px !important;
-            box-shadow: 0 2px 8px rgba(0,0,0,0.2) !important;
-        }}
-        .custom-tooltip {{ word-wrap: break-word; white-space: normal; }}
-        #{container_id} {{ margin: 0 auto; display: block; }}
-        </style>
-    </head>
-    <body>
-        <div id="{container_id}" style="position:relative;display:inline-block;">
-            <img src="data:image/png;base64,{image_data}"
-                 style="display:block;width:{display_w}px;height:{display_h}px;border:1px solid #ddd;border-radius:5px;"
-                 alt="Document page {page_idx + 1}" />
-            {overlays_html}
-
-            <div id="tooltip-{container_id}" class="custom-tooltip"
-                 style="position:absolute;background:rgba(0,0,0,0.9);color:white;padding:12px;
-                        border-radius:8px;font-size:13px;line-height:1.4;max-width:300px;
-                        pointer-events:none;z-index:1000;display:none;
-                        box-shadow:0 4px 12px rgba(0,0,0,0.3);">
-            </div>
-        </div>
-
-        <script>
-        document.addEventListener('DOMContentLoaded', function() {{
-            const container = document.getElementById('{container_id}');
-            const tooltip = document.getElementById('tooltip-{container_id}');
-            if (!container || !tooltip) return;
-
-            const overlays = container.querySelectorAll('.annotation-overlay');
-            overlays.forEach(overlay => {{
-                overlay.addEventListener('mouseenter', function(e) {{
-                    const tc = this.getAttribute('data-tooltip');
-                    if (tc) {{ tooltip.innerHTML = tc; tooltip.style.display = 'block'; }}
-                }});
-                overlay.addEventListener('mousemove', function(e) {{
-                    const rect = container.getBoundingClientRect();
-                    let x = e.clientX - rect.left + 10;
-                    let y = e.clientY - rect.top - 10;
-                    const tr = tooltip.getBoundingClientRect();
-                    const cr = container.getBoundingClientRect();
-                    if (x + tr.width > cr.width) x = x - tr.width - 20;
-                    if (y < 0) y = y + 30;
-                    tooltip.style.left = x + 'px';
-                    tooltip.style.top = y + 'px';
-                }});
-                overlay.addEventListener('mouseleave', function() {{
-                    tooltip.style.display = 'none';
-                }});
-            }});
-        }});
-        </script>
-    </body>
-    </html>
-    '''
-
-    return html_content
+    return "".join((
+        _VIEWER_HTML_PREFIX.format(
+            container_id=container_id,
+            image_data=image_data,
+            img_w=img_w,
+            img_h=img_h,
+            display_w=display_w,
+            display_h=display_h,
+            page_num=page_idx + 1,
+        ),
+        *overlay_parts,
+        _VIEWER_HTML_SUFFIX.format(container_id=container_id),
+    ))
 
 
 # ------------------------------------------------------------------
@@ -539,21 +846,23 @@ def _show_annotation_legend(display_width: int, zoom_level: float):
 # ------------------------------------------------------------------
 
 
+@st.fragment
 def render_document_preview(uploaded_file, file_source: str):
-    """Render document preview with optional annotations."""
+    """Render document preview with optional annotations.
+
+    Runs as a fragment so page navigation, zoom, and label toggles rerun
+    only the viewer instead of the whole script (client setup, processor
+    discovery, results tabs).
+    """
     if not uploaded_file:
         return
 
     st.header("Document Viewer")
 
-    # Read file data
+    # Read file data (cached per file across reruns)
     try:
-        if hasattr(uploaded_file, "read"):
-            uploaded_file.seek(0)
-            file_data = uploaded_file.read()
-        elif hasattr(uploaded_file, "getvalue"):
-            file_data = uploaded_file.getvalue()
-        else:
+        file_data = _read_file_data(uploaded_file)
+        if file_data is None:
             st.error("Unable to read file data")
             return
 
@@ -566,7 +875,7 @@ def render_document_preview(uploaded_file, file_source: str):
 
     # File info
     file_info = (
-        DocumentProcessor.get_file_info(uploaded_file)
+        DocumentProcessor.get_file_info(uploaded_file, data=file_data)
         if hasattr(uploaded_file, "name")
         else {}
     )
@@ -589,33 +898,31 @@ def render_document_preview(uploaded_file, file_source: str):
             if hasattr(uploaded_file, "name")
             else "pdf"
         )
-        images = DocumentProcessor.convert_to_images(file_data, ext)
+        total_pages = _page_count_cached(file_data, ext)
 
-        if not images:
+        if total_pages <= 0:
             st.warning("Could not generate preview for this document type.")
             return
 
-        st.session_state.document_images = images
-
         # Controls row
         col1, col2, col3 = st.columns([2, 2, 2])
 
         with col1:
-            if len(images) > 1:
+            if total_pages > 1:
                 st.session_state.current_page_idx = max(
-                    0, min(st.session_state.current_page_idx, len(images) - 1)
+                    0, min(st.session_state.current_page_idx, total_pages - 1)
                 )
                 nav1, nav2, nav3 = st.columns([1, 2, 1])
                 with nav1:
                     if st.button("Prev", disabled=st.session_state.current_page_idx == 0):
                         st.session_state.current_page_idx -= 1
-                        st.rerun()
+                        st.rerun(scope="fragment")
                 with nav2:
                     page_idx = st.selectbox(
                         "Page:",
-                        range(len(images)),
+                        range(total_pages),
                         index=st.session_state.current_page_idx,
-                        format_func=lambda x: f"Page {x + 1} of {len(images)}",
+                        format_func=lambda x: f"Page {x + 1} of {total_pages}",
                         key="page_selector",
                     )
                     if page_idx != st.session_state.current_page_idx:
@@ -623,10 +930,10 @@ def render_document_preview(uploaded_file, file_source: str):
                 with nav3:
                     if st.button(
                         "Next",
-                        disabled=st.session_state.current_page_idx == len(images) - 1,
+                        disabled=st.session_state.current_page_idx == total_pages - 1,
                     ):
                         st.session_state.current_page_idx += 1
-                        st.rerun()
+                        st.rerun(scope="fragment")
                 page_idx = st.session_state.current_page_idx
             else:
                 page_idx = 0
@@ -655,34 +962,34 @@ def render_document_preview(uploaded_file, file_source: str):
                 format="%.2fx",
             )
 
-        # Display image
-        if page_idx < len(images):
-            display_image = images[page_idx]
+        # Display image (rendered on demand, cached per page)
+        display_image = _render_page_cached(file_data, ext, page_idx)
+        if display_image is not None:
 
             if show_annotations and st.session_state.analysis_result:
                 try:
                     analysis = st.session_state.analysis_result
-                    bounding_boxes = analysis.get_bounding_boxes()
+                    page_index = st.session_state.page_box_index
+                    if page_index is None:
+                        page_index = _build_page_index(analysis.get_bounding_boxes())
+                        st.session_state.page_box_index = page_index
+                    page_boxes = page_index.get(page_idx, {})
 
-                    # Fix rotated page coordinates: if the API reports
+                    # Detect rotated page coordinates: if the API reports
                     # portrait dimensions but the rendered image is landscape
-                    # (or vice-versa), the PDF has a /Rotate flag.  Transform
-                    # normalised vertices so boxes align with the visual image.
+                    # (or vice-versa), the PDF has a /Rotate flag. Instead of
+                    # mutating the shared box index (which risks
+                    # double-rotation across reruns), pass a flag down and
+                    # apply the 90° swap inside the vectorized vertex step.
+                    needs_rotation = False
                     api_dims = analysis.get_page_dimensions(page_idx)
                     if api_dims:
                         api_portrait = api_dims["width"] < api_dims["height"]
                         img_portrait = display_image.width < display_image.height
-                        if api_portrait != img_portrait:
-                            for boxes in bounding_boxes.values():
-                                for box in boxes:
-                                    if box.get("page", 0) == page_idx:
-                                        box["vertices"] = [
-                                            {"x": 1 - v["y"], "y": v["x"]}
-                                            for v in box["vertices"]
-                                        ]
+                        needs_rotation = api_portrait != img_portrait
 
                     # Check if there are any bounding boxes at all
-                    has_boxes = any(boxes for boxes in bounding_boxes.values())
+                    has_boxes = bool(page_index)
 
                     if not has_boxes and analysis.is_layout_parser_result():
                         st.info(
@@ -695,32 +1002,55 @@ def render_document_preview(uploaded_file, file_source: str):
                             "Processor** instead."
                         )
                         st.image(
-                            display_image,
+                            _fit_preview(display_image),
                             caption=f"Page {page_idx + 1}",
                             use_container_width=True,
                         )
                     elif show_labels:
                         _show_annotation_legend(display_image.width, zoom_level)
                         html_content = _create_interactive_annotations(
-                            display_image, bounding_boxes, page_idx, zoom_level
+                            display_image, page_boxes, page_idx, zoom_level,
+                            rotate=needs_rotation,
                         )
                         component_height = int(display_image.height * zoom_level) + 40
                         components.html(html_content, height=component_height, scrolling=False)
                     else:
-                        annotator = SimpleDocumentAnnotator()
+                        if needs_rotation:
+                            # Hand the PIL annotator rotated copies rather
+                            # than mutating the shared index.
+                            page_boxes = {
+                                box_type: [
+                                    dict(box, vertices=np.stack(
+                                        [1.0 - box["vertices"][:, 1],
+                                         box["vertices"][:, 0]],
+                                        axis=-1,
+                                    ))
+                                    for box in boxes
+                                ]
+                                for box_type, boxes in page_boxes.items()
+                            }
+                        annotator = _annotator()
                         annotated = annotator.annotate_image(
-                            display_image, bounding_boxes, page_idx, show_labels=False
+                            display_image, page_boxes, page_idx, show_labels=False
                         )
                         st.image(
-                            annotated,
+                            _fit_preview(annotated),
                             caption=f"Page {page_idx + 1} (annotated)",
                             use_container_width=True,
                         )
                 except Exception as e:
                     st.error(f"Could not create annotations: {e}")
-                    st.image(display_image, caption=f"Page {page_idx + 1}", use_container_width=True)
+                    st.image(
+                        _fit_preview(display_image),
+                        caption=f"Page {page_idx + 1}",
+                        use_container_width=True,
+                    )
             else:
-                st.image(display_image, caption=f"Page {page_idx + 1}", use_container_width=True)
+                st.image(
+                    _fit_preview(display_image),
+                    caption=f"Page {page_idx + 1}",
+                    use_container_width=True,
+                )
 
     except Exception as e:
         st.error(f"Error generating document preview: {e}")
@@ -764,22 +1094,19 @@ def main():
 
     st.session_state.gcp_client = client
 
-    # Discover processors
-    if st.session_state.discovered_processors is None:
-        try:
-            st.session_state.discovered_processors = client.list_processors()
-        except Exception as e:
-            logger.warning(f"Could not discover processors: {e}")
-            st.session_state.discovered_processors = []
+    # Discover processors (cached across sessions with a TTL)
+    try:
+        discovered_processors = _list_processors_cached(client)
+    except Exception as e:
+        logger.warning("Could not discover processors: %s", e)
+        discovered_processors = []
 
     # Connection status
     render_connection_status(client)
 
     # Processor selection
     processor_info = ProcessorSelector.render_processor_selector(
-        st.session_state.discovered_processors
-        if st.session_state.discovered_processors
-        else None
+        discovered_processors if discovered_processors else None
     )
 
     if not processor_info:
@@ -799,34 +1126,30 @@ def main():
             if st.session_state.get("current_file_id") is not None:
                 st.session_state.analysis_result = None
                 st.session_state.raw_result_dict = None
-                st.session_state.document_images = None
+                st.session_state.page_box_index = None
                 st.session_state.current_page_idx = 0
                 st.session_state.current_file_id = None
                 st.session_state.uploaded_file = None
+                st.session_state.pop("_file_bytes_cache", None)
 
         if uploaded_file:
-            # Detect document change
-            current_file_id = None
-            if hasattr(uploaded_file, "name") and hasattr(uploaded_file, "getvalue"):
-                try:
-                    size = len(uploaded_file.getvalue())
-                    current_file_id = f"{uploaded_file.name}_{size}_{file_source}"
-                except Exception:
-                    current_file_id = f"{uploaded_file.name}_{file_source}"
-            elif hasattr(uploaded_file, "name"):
-                current_file_id = f"{uploaded_file.name}_{file_source}"
-            else:
-                current_file_id = f"unknown_{file_source}"
+            # Detect document change via a cheap fingerprint; the full
+            # buffer is only materialized (and cached) once per file.
+            current_file_id = _fingerprint_upload(uploaded_file, file_source)
 
             if current_file_id != st.session_state.current_file_id:
                 st.session_state.analysis_result = None
                 st.session_state.raw_result_dict = None
-                st.session_state.document_images = None
+                st.session_state.page_box_index = None
                 st.session_state.current_page_idx = 0
                 st.session_state.current_file_id = current_file_id
 
+            file_data = _read_file_data(uploaded_file)
+
             # Validate
-            is_valid, msg = DocumentProcessor.validate_file(uploaded_file)
+            is_valid, msg = DocumentProcessor.validate_file(
+                uploaded_file, data=file_data
+            )
             if is_valid:
                 st.success(msg)
                 st.session_state.uploaded_file = uploaded_file
@@ -834,12 +1157,7 @@ def main():
                 # Analyze button
                 if st.button("Analyze Document", type="primary", use_container_width=True):
                     try:
-                        if hasattr(uploaded_file, "read"):
-                            uploaded_file.seek(0)
-                            file_data = uploaded_file.read()
-                        elif hasattr(uploaded_file, "getvalue"):
-                            file_data = uploaded_file.getvalue()
-                        else:
+                        if file_data is None:
                             st.error("Unable to read file data for analysis")
                             st.stop()
 
@@ -847,11 +1165,15 @@ def main():
                             st.error("File data is empty. Please re-upload.")
                             st.stop()
 
-                        mime_type = DocumentProcessor.get_mime_type(
-                            uploaded_file.name if hasattr(uploaded_file, "name") else "document.pdf"
+                        file_name = (
+                            uploaded_file.name
+                            if hasattr(uploaded_file, "name")
+                            else "document.pdf"
                         )
+                        mime_type = DocumentProcessor.get_mime_type(file_name)
                         handle_document_analysis(
-                            client, processor_info, file_data, mime_type
+                            client, processor_info, file_data, mime_type,
+                            file_ext=file_name.split(".")[-1].lower(),
                         )
                     except Exception as e:
                         st.error(f"Error preparing file for analysis: {e}")
@@ -2,16 +2,33 @@
 Configuration for GCP Document AI processors, categories, colors, and constants.
 """
 
-from typing import Dict, List, Any
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
 
 # GCP Document AI constants
 GCP_DOCAI_LOCATIONS = ["us", "eu"]
 GCP_DOCAI_DEFAULT_LOCATION = "us"
 
+
+@dataclass(frozen=True, slots=True)
+class ProcessorInfo:
+    """Static metadata for a known Document AI processor type."""
+
+    name: str
+    description: str
+    category: str
+    gcp_type: str
+    capabilities: Tuple[str, ...]
+    max_pages_online: int
+    supported_formats: Tuple[str, ...]
+    entity_extraction: bool
+    icon: str
+
+
 # Processor type definitions
 # These define the known processor types. Actual processor IDs are project-specific
 # and discovered via list_processors() or configured manually.
-GCP_DOCAI_PROCESSORS = {
+_RAW_PROCESSORS = {
     "OCR_PROCESSOR": {
         "name": "Enterprise Document OCR",
         "description": "Extract text, handwriting, and layout from documents with high accuracy",
@@ -146,6 +163,23 @@ GCP_DOCAI_PROCESSORS = {
     },
 }
 
+# Frozen, slotted entries: attribute access instead of dict hashing on the
+# sidebar render path, and immutability guards the shared module state.
+GCP_DOCAI_PROCESSORS: Dict[str, ProcessorInfo] = {
+    proc_type: ProcessorInfo(
+        name=raw["name"],
+        description=raw["description"],
+        category=raw["category"],
+        gcp_type=raw["gcp_type"],
+        capabilities=tuple(raw["capabilities"]),
+        max_pages_online=raw["max_pages_online"],
+        supported_formats=tuple(raw["supported_formats"]),
+        entity_extraction=raw["entity_extraction"],
+        icon=raw["icon"],
+    )
+    for proc_type, raw in _RAW_PROCESSORS.items()
+}
+
 # Processor categories for UI organization
 PROCESSOR_CATEGORIES = [
     "General",
@@ -229,28 +263,33 @@ MIME_TYPE_MAP = {
     ".webp": "image/webp",
 }
 
+# Same mapping keyed on the bare extension, so lookups don't have to
+# prepend the dot first.
+EXTENSION_TO_MIME = {ext.lstrip("."): mime for ext, mime in MIME_TYPE_MAP.items()}
+
+
+# Category index and display labels, computed once at import; the sidebar
+# asks for these on every rerun.
+_CATEGORY_INDEX: Dict[str, List[str]] = {}
+for _proc_type, _info in GCP_DOCAI_PROCESSORS.items():
+    _CATEGORY_INDEX.setdefault(_info.category, []).append(_proc_type)
+
+_DISPLAY_NAMES: Dict[str, str] = {
+    _proc_type: f"{_info.icon} {_info.name}" if _info.icon else _info.name
+    for _proc_type, _info in GCP_DOCAI_PROCESSORS.items()
+}
+
 
 def get_processors_by_category() -> Dict[str, List[str]]:
-    """Get processors organized by category."""
-    categorized: Dict[str, List[str]] = {}
-    for proc_type, proc_info in GCP_DOCAI_PROCESSORS.items():
-        category = proc_info.get("category", "Other")
-        if category not in categorized:
-            categorized[category] = []
-        categorized[category].append(proc_type)
-    return categorized
+    """Get processors organized by category (precomputed at import)."""
+    return _CATEGORY_INDEX
 
 
 def get_processor_display_name(processor_type: str) -> str:
     """Get the display name for a processor type."""
-    if processor_type in GCP_DOCAI_PROCESSORS:
-        info = GCP_DOCAI_PROCESSORS[processor_type]
-        icon = info.get("icon", "")
-        name = info["name"]
-        return f"{icon} {name}" if icon else name
-    return processor_type
+    return _DISPLAY_NAMES.get(processor_type, processor_type)
 
 
-def get_processor_info(processor_type: str) -> Dict[str, Any]:
-    """Get full info dict for a processor type."""
-    return GCP_DOCAI_PROCESSORS.get(processor_type, {})
+def get_processor_info(processor_type: str) -> Optional[ProcessorInfo]:
+    """Get the ProcessorInfo entry for a processor type, if known."""
+    return GCP_DOCAI_PROCESSORS.get(processor_type)
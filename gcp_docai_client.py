@@ -5,16 +5,32 @@ Uses the REST API with service account JSON for authentication (no SDK).
 """
 
 import base64
-import json
+import hashlib
 import os
+import logging
+import sys
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from typing import Dict, Any, Optional, Tuple, List
 
+try:
+    # SIMD base64 (AVX2/NEON); several times faster than the stdlib scalar
+    # encoder on multi-MB uploads. Drop-in compatible API.
+    import pybase64 as _b64
+except ImportError:
+    _b64 = base64
+
+import numpy as np
+import orjson
 import requests
-import streamlit as st
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
+from cryptography.hazmat.primitives.asymmetric import ec, padding
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
 
 from logging_config import get_logger
 
@@ -23,12 +39,74 @@ logger = get_logger(__name__)
 _SCOPE = "https://www.googleapis.com/auth/cloud-platform"
 _TOKEN_LIFETIME = 3600  # seconds
 
+# Shared empty vertex array, returned whenever a boundingPoly is absent so
+# callers never allocate for the miss case.
+_EMPTY_VERTICES = np.empty((0, 2), dtype=np.float32)
+
+# Selection-mark types emitted by the API; exact membership is the common
+# case, the lowercased substring test is only a fallback for variants.
+_CHECKBOX_TYPES = frozenset({"filled_checkbox", "unfilled_checkbox"})
+
+# Hoisted content-label prefix; plain concatenation with a module constant
+# skips the per-box format-spec machinery in the hot box-building loops.
+_CB_PREFIX = "Checkbox: "
+
+# Checkbox content labels are drawn from a tiny value set, so the full
+# label can be prebuilt; the .get miss path handles API variants.
+_CB_CONTENT = {t: _CB_PREFIX + t for t in _CHECKBOX_TYPES}
+
+
+def _as_int(value: Any, default: int = 0) -> int:
+    """
+    Coerce a JSON numeric field to int.
+
+    The REST API serializes int64 fields as JSON strings, but small values
+    (page numbers, text offsets) usually arrive as plain ints — the exact
+    type check skips an int() call per field on that common path.
+    """
+    if type(value) is int:
+        return value
+    if value is None:
+        return default
+    return int(value)
+
+
+def _is_checkbox_type(value: str) -> bool:
+    """True if a visualElement/valueType string denotes a checkbox."""
+    return value in _CHECKBOX_TYPES or (
+        bool(value) and "checkbox" in value.lower()
+    )
+
 
 def _b64url(data: bytes) -> str:
     """Base64url-encode without padding."""
     return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
 
 
+# Shared pooled session for the OAuth token endpoints. Bare requests.post
+# opened a fresh TCP+TLS connection for every hourly refresh; a pooled
+# session resumes the TLS session across refreshes. Timeouts keep a wedged
+# socket from stalling the auth path that every API call sits behind.
+_TOKEN_SESSION = requests.Session()
+_TOKEN_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4))
+_TOKEN_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+# Parsed RSA keys keyed by a PEM fingerprint. load_pem_private_key runs the
+# expensive RSA key consistency checks on every parse, which dominates the
+# token mint; a credential's key never changes, so parse it once per process.
+_SIGNING_KEY_CACHE: Dict[bytes, Any] = {}
+
+
+def _load_signing_key(pem: str):
+    """Return the parsed RSA private key for a PEM string, cached."""
+    fingerprint = hashlib.sha256(pem.encode()).digest()
+    key = _SIGNING_KEY_CACHE.get(fingerprint)
+    if key is None:
+        key = serialization.load_pem_private_key(pem.encode(), password=None)
+        _SIGNING_KEY_CACHE[fingerprint] = key
+    return key
+
+
 def _mint_access_token_sa(cred_info: Dict[str, Any]) -> Tuple[str, float]:
     """
     Create a self-signed JWT and exchange it for a Google OAuth2 access token.
@@ -38,32 +116,42 @@ def _mint_access_token_sa(cred_info: Dict[str, Any]) -> Tuple[str, float]:
         (access_token, expiry_timestamp)
     """
     now = int(time.time())
-    header = json.dumps({"alg": "RS256", "typ": "JWT"}).encode()
-    payload = json.dumps({
+    private_key = _load_signing_key(cred_info["private_key"])
+    # ES256 for service accounts provisioned with EC P-256 keys: an ECDSA
+    # sign is several times cheaper than RSA PKCS#1 v1.5. RS256 stays the
+    # path for the usual RSA keys.
+    is_ec = isinstance(private_key, ec.EllipticCurvePrivateKey)
+    header = orjson.dumps({"alg": "ES256" if is_ec else "RS256", "typ": "JWT"})
+    payload = orjson.dumps({
         "iss": cred_info["client_email"],
         "scope": _SCOPE,
         "aud": cred_info["token_uri"],
         "iat": now,
         "exp": now + _TOKEN_LIFETIME,
-    }).encode()
+    })
 
     signing_input = _b64url(header) + "." + _b64url(payload)
-    private_key = serialization.load_pem_private_key(
-        cred_info["private_key"].encode(), password=None
-    )
-    signature = private_key.sign(
-        signing_input.encode(),
-        padding.PKCS1v15(),
-        hashes.SHA256(),
-    )
+    if is_ec:
+        # JWS wants the raw r||s concatenation, not the DER encoding.
+        der = private_key.sign(signing_input.encode(), ec.ECDSA(hashes.SHA256()))
+        r, s = decode_dss_signature(der)
+        size = (private_key.curve.key_size + 7) // 8
+        signature = r.to_bytes(size, "big") + s.to_bytes(size, "big")
+    else:
+        signature = private_key.sign(
+            signing_input.encode(),
+            padding.PKCS1v15(),
+            hashes.SHA256(),
+        )
     jwt_token = signing_input + "." + _b64url(signature)
 
-    resp = requests.post(
+    resp = _TOKEN_SESSION.post(
         cred_info["token_uri"],
         data={
             "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
             "assertion": jwt_token,
         },
+        timeout=_TOKEN_TIMEOUT,
     )
     resp.raise_for_status()
     token_data = resp.json()
@@ -80,7 +168,7 @@ def _refresh_access_token_user(cred_info: Dict[str, Any]) -> Tuple[str, float]:
     Returns:
         (access_token, expiry_timestamp)
     """
-    resp = requests.post(
+    resp = _TOKEN_SESSION.post(
         "https://oauth2.googleapis.com/token",
         data={
             "grant_type": "refresh_token",
@@ -88,6 +176,7 @@ def _refresh_access_token_user(cred_info: Dict[str, Any]) -> Tuple[str, float]:
             "client_secret": cred_info["client_secret"],
             "refresh_token": cred_info["refresh_token"],
         },
+        timeout=_TOKEN_TIMEOUT,
     )
     resp.raise_for_status()
     token_data = resp.json()
@@ -96,20 +185,45 @@ def _refresh_access_token_user(cred_info: Dict[str, Any]) -> Tuple[str, float]:
     return access_token, int(time.time()) + expires_in
 
 
+# Credential type -> minting strategy; new types (e.g. external_account)
+# slot in here without touching the dispatch below.
+_TOKEN_MINTERS = {
+    "service_account": _mint_access_token_sa,
+    "authorized_user": _refresh_access_token_user,
+}
+
+
 def _get_access_token(cred_info: Dict[str, Any]) -> Tuple[str, float]:
     """Dispatch to the right token minting strategy based on credential type."""
     cred_type = cred_info.get("type", "")
-    if cred_type == "service_account":
-        return _mint_access_token_sa(cred_info)
-    elif cred_type == "authorized_user":
-        return _refresh_access_token_user(cred_info)
-    else:
-        raise ValueError(f"Unsupported credential type: {cred_type!r}")
+    try:
+        minter = _TOKEN_MINTERS[cred_type]
+    except KeyError:
+        raise ValueError(f"Unsupported credential type: {cred_type!r}") from None
+    return minter(cred_info)
 
 
 class GCPDocumentAIClient:
     """Client for GCP Document AI using the REST API with OAuth2 auth."""
 
+    # How long a list_processors result is served from the instance cache.
+    _PROCESSORS_TTL = 60.0  # seconds
+
+    # Online (:process) payload ceiling. The API rejects ~20MB requests;
+    # warn a bit below that so the log explains the failure mode.
+    _ONLINE_SIZE_WARN = 18_000_000  # bytes
+
+    # Default fieldMask for :process. DocumentAnalysisResult only ever reads
+    # these fields, and asking for just them lets the API skip marshalling
+    # token-level detail we never consume — OCR responses shrink several-fold,
+    # which cuts both transfer and parse time. pages.dimension is included
+    # for the rotation check. Pass field_mask explicitly to override.
+    DEFAULT_FIELD_MASK = (
+        "text,pages.lines,pages.paragraphs,pages.tables,pages.formFields,"
+        "pages.visualElements,pages.dimension,entities,documentLayout,"
+        "chunkedDocument"
+    )
+
     def __init__(self, endpoint: str, cred_info: Dict[str, Any]):
         """
         Initialize the GCP Document AI REST client.
@@ -123,28 +237,106 @@ class GCPDocumentAIClient:
         self._cred_info = cred_info
         self._access_token: Optional[str] = None
         self._token_expiry: float = 0
+        self._processors_cache: Optional[Tuple[float, List[Dict[str, Any]]]] = None
+        self._process_urls: Dict[str, str] = {}
+        self._token_lock = threading.Lock()
+        self._refresh_inflight = False
         self.session = requests.Session()
+        # Explicit adapter so pooled keep-alive connections survive bursts:
+        # reusing the TCP+TLS connection to *.googleapis.com saves a
+        # ~100-200 ms handshake on every call after the first. Transient
+        # quota/backend errors (429/5xx) retry with exponential backoff
+        # instead of failing the run; POST is safe to retry because
+        # :process is idempotent for identical content.
+        retries = Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(["GET", "POST"]),
+            respect_retry_after_header=True,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4, pool_maxsize=32, pool_block=False, max_retries=retries
+        )
+        self.session.mount("https://", adapter)
+        # Ask for gzip explicitly: OCR responses are multi-MB JSON that
+        # compresses 5-10x, and urllib3 decompresses transparently.
+        self.session.headers.update(
+            {"Connection": "keep-alive", "Accept-Encoding": "gzip"}
+        )
+
+        logger.info("GCP Document AI REST client initialized for endpoint=%s", self.endpoint)
 
-        logger.info(f"GCP Document AI REST client initialized for endpoint={self.endpoint}")
+    def _process_url(self, processor_id: str) -> str:
+        """Return the :process URL for a processor, memoized per client."""
+        url = self._process_urls.get(processor_id)
+        if url is None:
+            url = f"{self.endpoint}/processors/{processor_id}:process"
+            self._process_urls[processor_id] = url
+        return url
 
     def _get_auth_headers(self) -> Dict[str, str]:
-        """Return Authorization header, refreshing the token if needed."""
-        if not self._access_token or time.time() >= self._token_expiry - 60:
-            self._access_token, self._token_expiry = _get_access_token(self._cred_info)
+        """
+        Return the Authorization header, refreshing the token if needed.
+
+        Within five minutes of expiry the refresh runs in a background
+        thread so the JWT sign plus token-endpoint round trip stays off
+        the request path; the synchronous mint inside the final 60 seconds
+        remains as the safety net.
+        """
+        now = time.time()
+        if not self._access_token or now >= self._token_expiry - 60:
+            with self._token_lock:
+                if not self._access_token or time.time() >= self._token_expiry - 60:
+                    self._access_token, self._token_expiry = _get_access_token(
+                        self._cred_info
+                    )
+        elif now >= self._token_expiry - 300:
+            self._start_background_refresh()
         return {"Authorization": f"Bearer {self._access_token}"}
 
+    def _start_background_refresh(self) -> None:
+        """Kick off one proactive token refresh if none is in flight."""
+        with self._token_lock:
+            if self._refresh_inflight:
+                return
+            self._refresh_inflight = True
+        threading.Thread(target=self._refresh_token, daemon=True).start()
+
+    def _refresh_token(self) -> None:
+        try:
+            token, expiry = _get_access_token(self._cred_info)
+            with self._token_lock:
+                self._access_token, self._token_expiry = token, expiry
+        except Exception as e:
+            # The synchronous path retries once the 60s window is reached.
+            logger.warning("Proactive token refresh failed: %s", e)
+        finally:
+            with self._token_lock:
+                self._refresh_inflight = False
+
     def list_processors(self) -> List[Dict[str, Any]]:
         """
         Discover available processors in the project.
 
+        The result is cached on the instance for a short TTL: the sidebar
+        connection check runs on every Streamlit rerun, and processors
+        change rarely enough that a fresh GET per interaction is waste.
+
         Returns:
             List of processor info dicts with keys: name, display_name, type, state, id
         """
+        cached = self._processors_cache
+        if cached is not None:
+            ts, processors = cached
+            if time.monotonic() - ts < self._PROCESSORS_TTL:
+                return processors
+
         url = f"{self.endpoint}/processors"
         try:
             resp = self.session.get(url, headers=self._get_auth_headers())
             resp.raise_for_status()
-            data = resp.json()
+            data = orjson.loads(resp.content)
 
             processors = []
             for proc in data.get("processors", []):
@@ -158,11 +350,12 @@ class GCPDocumentAIClient:
                     "id": proc_id,
                 })
 
-            logger.info(f"Found {len(processors)} processors in project")
+            logger.info("Found %d processors in project", len(processors))
+            self._processors_cache = (time.monotonic(), processors)
             return processors
 
         except Exception as e:
-            logger.error(f"Failed to list processors: {e}")
+            logger.error("Failed to list processors: %s", e)
             raise
 
     def process_document(
@@ -180,38 +373,55 @@ class GCPDocumentAIClient:
             processor_id: The processor ID (not the full resource name)
             document_data: Raw document bytes
             mime_type: MIME type of the document
-            field_mask: Optional field mask to limit response fields
+            field_mask: Field mask limiting response fields; defaults to
+                DEFAULT_FIELD_MASK (everything the result wrapper reads)
             process_options: Optional processOptions dict (e.g. layoutConfig)
 
         Returns:
             Document dict (the "document" key from the REST response)
         """
-        url = f"{self.endpoint}/processors/{processor_id}:process"
-        content_b64 = base64.b64encode(document_data).decode("utf-8")
-
-        body: Dict[str, Any] = {
-            "rawDocument": {
-                "content": content_b64,
-                "mimeType": mime_type,
-            }
-        }
+        url = self._process_url(processor_id)
+        if field_mask is None:
+            field_mask = self.DEFAULT_FIELD_MASK
+
+        if len(document_data) > self._ONLINE_SIZE_WARN:
+            logger.warning(
+                "Document is %d bytes; online processing caps out around "
+                "20MB — requests this large may be rejected by the API",
+                len(document_data),
+            )
 
+        # Assemble the JSON envelope as bytes around the base64 payload.
+        # Base64 output needs no JSON escaping, so splicing it in directly
+        # skips the str decode plus the serializer escape-scan over the
+        # multi-MB content that a dict body would cost.
+        envelope: List[bytes] = [
+            b'{"rawDocument":{"content":"',
+            _b64.b64encode(document_data),
+            b'","mimeType":',
+            orjson.dumps(mime_type),
+            b"}",
+        ]
         if field_mask:
-            body["fieldMask"] = field_mask
-
+            envelope += [b',"fieldMask":', orjson.dumps(field_mask)]
         if process_options:
-            body["processOptions"] = process_options
+            envelope += [b',"processOptions":', orjson.dumps(process_options)]
+        envelope.append(b"}")
+        body = b"".join(envelope)
 
         logger.info(
-            f"Processing document with processor {processor_id}, mime={mime_type}, size={len(document_data)} bytes"
+            "Processing document with processor %s, mime=%s, size=%d bytes",
+            processor_id, mime_type, len(document_data),
         )
 
         try:
-            resp = self.session.post(
-                url, headers=self._get_auth_headers(), json=body
-            )
+            headers = self._get_auth_headers()
+            headers["Content-Type"] = "application/json"
+            resp = self.session.post(url, headers=headers, data=body)
             resp.raise_for_status()
-            result = resp.json()
+            # orjson decodes straight from the response bytes, skipping the
+            # unicode re-decode stdlib json would do on multi-MB documents.
+            result = orjson.loads(resp.content)
             logger.info("Document processing completed successfully")
             return result.get("document", {})
         except requests.HTTPError as e:
@@ -220,8 +430,9 @@ class GCPDocumentAIClient:
                 error_detail = e.response.text
             except Exception:
                 pass
-            logger.error(f"Document processing failed: {e} — {error_detail}")
-            logger.debug(f"Traceback:\n{traceback.format_exc()}")
+            logger.error("Document processing failed: %s — %s", e, error_detail)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Traceback:\n%s", traceback.format_exc())
             # Re-raise with the API error body so callers can display it
             if error_detail:
                 raise requests.HTTPError(
@@ -230,10 +441,58 @@ class GCPDocumentAIClient:
                 ) from e
             raise
         except Exception as e:
-            logger.error(f"Document processing failed: {e}")
-            logger.debug(f"Traceback:\n{traceback.format_exc()}")
+            logger.error("Document processing failed: %s", e)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Traceback:\n%s", traceback.format_exc())
             raise
 
+    def process_documents(
+        self,
+        processor_id: str,
+        items: List[Tuple[bytes, str]],
+        field_mask: Optional[str] = None,
+        process_options: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several documents concurrently through one processor.
+
+        Requests run on a thread pool over the pooled session, so
+        throughput approaches max_workers times the single-document rate
+        instead of 1/latency. The session adapter's pool is sized well
+        above the default worker count. The token is prefetched once up
+        front so the workers don't race the first mint.
+
+        Args:
+            processor_id: The processor ID (not the full resource name)
+            items: List of (document_data, mime_type) pairs
+            field_mask: Optional field mask, as for process_document
+            process_options: Optional processOptions dict applied to all items
+            max_workers: Concurrent request ceiling
+
+        Returns:
+            Document dicts in the same order as *items*
+        """
+        if not items:
+            return []
+        if len(items) == 1:
+            data, mime = items[0]
+            return [
+                self.process_document(
+                    processor_id, data, mime, field_mask, process_options
+                )
+            ]
+        self._get_auth_headers()
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+            futures = [
+                pool.submit(
+                    self.process_document,
+                    processor_id, data, mime, field_mask, process_options,
+                )
+                for data, mime in items
+            ]
+            return [f.result() for f in futures]
+
     def test_connection(self) -> Tuple[bool, str]:
         """
         Test connectivity by listing processors.
@@ -254,7 +513,16 @@ class DocumentAnalysisResult:
 
     def __init__(self, document: Dict[str, Any]):
         self.document = document
-        logger.debug(f"DocumentAnalysisResult top-level keys: {list(document.keys())}")
+        # The same layout dicts are resolved repeatedly (bounding boxes,
+        # tables, form fields, formatted fields), so memoize per layout
+        # identity; the parsed document is immutable for this object's
+        # lifetime. The full text is fetched once for the same reason.
+        self._full_text: str = document.get("text", "")
+        self._layout_text_cache: Dict[int, str] = {}
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "DocumentAnalysisResult top-level keys: %s", list(document.keys())
+            )
 
     # ------------------------------------------------------------------
     # Text helpers
@@ -262,25 +530,38 @@ class DocumentAnalysisResult:
 
     def get_text(self) -> str:
         """Get the full OCR text."""
-        return self.document.get("text", "")
+        return self._full_text
 
     def _layout_to_text(self, layout: Optional[Dict[str, Any]]) -> str:
-        """Resolve a layout's textAnchor to actual text from document.text."""
-        full_text = self.document.get("text", "")
+        """Resolve a layout's textAnchor to actual text from document.text.
+
+        Memoized per layout dict identity — the extractors revisit the
+        same layouts across calls.
+        """
         if not layout:
             return ""
+        cached = self._layout_text_cache.get(id(layout))
+        if cached is not None:
+            return cached
+
+        text = ""
         text_anchor = layout.get("textAnchor")
-        if not text_anchor:
-            return ""
-        segments = text_anchor.get("textSegments", [])
-        if not segments:
-            return ""
-        parts = []
-        for segment in segments:
-            start = int(segment.get("startIndex", 0))
-            end = int(segment.get("endIndex", 0))
-            parts.append(full_text[start:end])
-        return "".join(parts).strip()
+        if text_anchor:
+            segments = text_anchor.get("textSegments") or ()
+            full_text = self._full_text
+            if len(segments) == 1:
+                # Fast path — almost every layout has a single segment.
+                segment = segments[0]
+                text = full_text[
+                    _as_int(segment.get("startIndex")):_as_int(segment.get("endIndex"))
+                ].strip()
+            elif segments:
+                text = "".join(
+                    full_text[_as_int(s.get("startIndex")):_as_int(s.get("endIndex"))]
+                    for s in segments
+                ).strip()
+        self._layout_text_cache[id(layout)] = text
+        return text
 
     # ------------------------------------------------------------------
     # Page-level accessors
@@ -303,7 +584,7 @@ class DocumentAnalysisResult:
         has_layout = bool(self.document.get("documentLayout"))
         has_pages_content = any(
             page.get("lines") or page.get("paragraphs") or page.get("tables") or page.get("formFields")
-            for page in self.document.get("pages", [])
+            for page in self.document.get("pages", ())
         )
         return has_layout and not has_pages_content
 
@@ -316,7 +597,14 @@ class DocumentAnalysisResult:
           - page_start: int
           - page_end: int
           - level: int  (nesting depth, 0 = top-level)
+
+        Built once and cached; the summary line and the layout tab both
+        ask for it on every rerun.
         """
+        return self._document_layout
+
+    @cached_property
+    def _document_layout(self) -> List[Dict[str, Any]]:
         doc_layout = self.document.get("documentLayout", {})
         blocks = doc_layout.get("blocks", [])
         result: List[Dict[str, Any]] = []
@@ -329,8 +617,15 @@ class DocumentAnalysisResult:
         out: List[Dict[str, Any]],
         level: int,
     ) -> None:
-        """Recursively walk layout blocks and append flat entries to *out*."""
-        for block in blocks:
+        """Walk layout blocks and append flat entries to *out*.
+
+        Iterative with an explicit stack: nested headings/lists/tables can
+        run deep, and a Python frame per block is pure overhead for what is
+        a simple pre-order flatten.
+        """
+        stack = [(block, level) for block in reversed(blocks)]
+        while stack:
+            block, level = stack.pop()
             block_type = "block"
             text = ""
 
@@ -355,7 +650,11 @@ class DocumentAnalysisResult:
                             tb = cb.get("textBlock")
                             if tb:
                                 cell_parts.append(tb.get("text", ""))
-                        cell_texts.append(" ".join(cell_parts).strip())
+                        # Skip the join allocation for the common 1-run cell.
+                        if len(cell_parts) == 1:
+                            cell_texts.append(cell_parts[0].strip())
+                        else:
+                            cell_texts.append(" ".join(cell_parts).strip())
                     parts.append(" | ".join(cell_texts))
                 text = "\n".join(parts)
             elif list_block:
@@ -371,8 +670,8 @@ class DocumentAnalysisResult:
 
             # Page span
             page_span = block.get("pageSpan", {})
-            page_start = int(page_span.get("pageStart", 0))
-            page_end = int(page_span.get("pageEnd", page_start))
+            page_start = _as_int(page_span.get("pageStart"))
+            page_end = _as_int(page_span.get("pageEnd"), page_start)
 
             out.append({
                 "type": block_type,
@@ -382,10 +681,11 @@ class DocumentAnalysisResult:
                 "level": level,
             })
 
-            # Recurse into nested blocks (textBlock and others can have sub-blocks)
-            nested = block.get("blocks", [])
+            # Nested blocks (textBlock and others can have sub-blocks) go on
+            # the stack reversed so left-to-right pre-order is preserved.
+            nested = block.get("blocks")
             if nested:
-                self._walk_layout_blocks(nested, out, level + 1)
+                stack.extend((b, level + 1) for b in reversed(nested))
 
     def get_layout_page_count(self) -> int:
         """Derive page count from layout block page spans.
@@ -410,20 +710,23 @@ class DocumentAnalysisResult:
           - content: str
           - page_span: dict with ``page_start`` and ``page_end``
         """
+        return self._chunked_document
+
+    @cached_property
+    def _chunked_document(self) -> List[Dict[str, Any]]:
         chunked = self.document.get("chunkedDocument", {})
-        chunks = chunked.get("chunks", [])
-        result = []
-        for chunk in chunks:
-            page_span = chunk.get("pageSpan", {})
-            result.append({
+        return [
+            {
                 "chunk_id": chunk.get("chunkId", ""),
                 "content": chunk.get("content", ""),
                 "page_span": {
-                    "page_start": int(page_span.get("pageStart", 0)),
-                    "page_end": int(page_span.get("pageEnd", 0)),
+                    "page_start": _as_int(page_span.get("pageStart")),
+                    "page_end": _as_int(page_span.get("pageEnd")),
                 },
-            })
-        return result
+            }
+            for chunk in chunked.get("chunks", ())
+            for page_span in [chunk.get("pageSpan", {})]
+        ]
 
     def get_page_dimensions(self, page_index: int = 0) -> Optional[Dict[str, float]]:
         """Get the API-reported page dimensions for rotation detection.
@@ -451,13 +754,11 @@ class DocumentAnalysisResult:
             return []
         page = pages[page_index]
         lines = []
-        for line in page.get("lines", []):
+        for line in page.get("lines", ()):
             layout = line.get("layout")
             text = self._layout_to_text(layout)
             confidence = layout.get("confidence", 0.0) if layout else 0.0
-            vertices = self._get_normalized_vertices(
-                layout.get("boundingPoly")
-            ) if layout else []
+            vertices = self._layout_vertices(layout)
             lines.append({
                 "text": text,
                 "confidence": confidence,
@@ -470,46 +771,62 @@ class DocumentAnalysisResult:
     # ------------------------------------------------------------------
 
     def get_entities(self) -> List[Dict[str, Any]]:
-        """Get all extracted entities."""
-        entities = []
-        for entity in self.document.get("entities", []):
-            mention_text = entity.get("mentionText", "")
-            normalized_value = ""
-            nv = entity.get("normalizedValue")
-            if nv:
-                normalized_value = nv.get("text", "")
-
-            vertices = []
-            page_index = 0
-            page_anchor = entity.get("pageAnchor")
-            if page_anchor:
-                page_refs = page_anchor.get("pageRefs", [])
-                if page_refs:
-                    ref = page_refs[0]
-                    page_index = int(ref.get("page", 0))
-                    bp = ref.get("boundingPoly")
-                    if bp:
-                        vertices = self._get_normalized_vertices(bp)
-
-            entities.append({
-                "type": entity.get("type", ""),
-                "mention_text": mention_text,
-                "normalized_value": normalized_value,
-                "confidence": entity.get("confidence", 0.0),
-                "page": page_index,
-                "vertices": vertices,
-            })
-        return entities
+        """Get all extracted entities (built once, cached on the result)."""
+        return self._entities
+
+    @cached_property
+    def _entities(self) -> List[Dict[str, Any]]:
+        # Unconditional one-record-per-entity build: a list comprehension
+        # appends via the LIST_APPEND opcode and sizes in fewer
+        # reallocations than repeated .append.
+        return [
+            self._entity_record(entity)
+            for entity in self.document.get("entities", ())
+        ]
+
+    def _entity_record(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        """Build one entity dict for the entities view."""
+        normalized_value = ""
+        nv = entity.get("normalizedValue")
+        if nv:
+            normalized_value = nv.get("text", "")
+
+        vertices = _EMPTY_VERTICES
+        page_index = 0
+        page_anchor = entity.get("pageAnchor")
+        if page_anchor:
+            page_refs = page_anchor.get("pageRefs", [])
+            if page_refs:
+                ref = page_refs[0]
+                page_index = _as_int(ref.get("page"))
+                bp = ref.get("boundingPoly")
+                if bp:
+                    vertices = self._get_normalized_vertices(bp)
+
+        return {
+            # Label sets are tiny (tens of values per processor); interning
+            # collapses the per-entity copies orjson parsed into one object.
+            "type": sys.intern(entity.get("type", "")),
+            "mention_text": entity.get("mentionText", ""),
+            "normalized_value": normalized_value,
+            "confidence": entity.get("confidence", 0.0),
+            "page": page_index,
+            "vertices": vertices,
+        }
 
     # ------------------------------------------------------------------
     # Tables
     # ------------------------------------------------------------------
 
     def get_tables(self) -> List[Dict[str, Any]]:
-        """Get all tables across all pages."""
+        """Get all tables across all pages (built once, cached on the result)."""
+        return self._tables
+
+    @cached_property
+    def _tables(self) -> List[Dict[str, Any]]:
         tables = []
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for table in page.get("tables", []):
+        for page_idx, page in enumerate(self.document.get("pages", ())):
+            for table in page.get("tables", ()):
                 header_rows = []
                 for row in table.get("headerRows", []):
                     cells = []
@@ -525,9 +842,7 @@ class DocumentAnalysisResult:
                     body_rows.append(cells)
 
                 layout = table.get("layout")
-                vertices = self._get_normalized_vertices(
-                    layout.get("boundingPoly")
-                ) if layout else []
+                vertices = self._layout_vertices(layout)
 
                 tables.append({
                     "page": page_idx,
@@ -545,22 +860,22 @@ class DocumentAnalysisResult:
     # ------------------------------------------------------------------
 
     def get_form_fields(self) -> List[Dict[str, Any]]:
-        """Get all form fields (key-value pairs) across pages."""
+        """Get all form fields (key-value pairs) across pages (cached)."""
+        return self._form_fields
+
+    @cached_property
+    def _form_fields(self) -> List[Dict[str, Any]]:
         fields = []
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for field in page.get("formFields", []):
+        for page_idx, page in enumerate(self.document.get("pages", ())):
+            for field in page.get("formFields", ()):
                 field_name = field.get("fieldName")
                 field_value = field.get("fieldValue")
 
                 key_text = self._layout_to_text(field_name)
                 value_text = self._layout_to_text(field_value)
 
-                key_vertices = self._get_normalized_vertices(
-                    field_name.get("boundingPoly")
-                ) if field_name else []
-                value_vertices = self._get_normalized_vertices(
-                    field_value.get("boundingPoly")
-                ) if field_value else []
+                key_vertices = self._layout_vertices(field_name)
+                value_vertices = self._layout_vertices(field_value)
 
                 confidence = field_name.get("confidence", 0.0) if field_name else 0.0
 
@@ -579,17 +894,19 @@ class DocumentAnalysisResult:
     # ------------------------------------------------------------------
 
     def get_checkboxes(self) -> List[Dict[str, Any]]:
-        """Get all detected checkboxes across pages."""
+        """Get all detected checkboxes across pages (cached)."""
+        return self._checkboxes
+
+    @cached_property
+    def _checkboxes(self) -> List[Dict[str, Any]]:
         checkboxes = []
-        for page_idx, page in enumerate(self.document.get("pages", [])):
+        for page_idx, page in enumerate(self.document.get("pages", ())):
             # Actual selection mark detection (visual checkmarks)
-            for block in page.get("visualElements", []):
+            for block in page.get("visualElements", ()):
                 block_type = block.get("type", "")
-                if block_type in ("filled_checkbox", "unfilled_checkbox"):
+                if block_type in _CHECKBOX_TYPES:
                     layout = block.get("layout")
-                    vertices = self._get_normalized_vertices(
-                        layout.get("boundingPoly")
-                    ) if layout else []
+                    vertices = self._layout_vertices(layout)
                     checkboxes.append({
                         "page": page_idx,
                         "state": block_type,
@@ -598,15 +915,13 @@ class DocumentAnalysisResult:
                     })
 
             # Also detect from form_fields with checkbox value_type
-            for field in page.get("formFields", []):
+            for field in page.get("formFields", ()):
                 field_value = field.get("fieldValue")
                 value_type = ""
                 if field_value:
                     value_type = field_value.get("valueType", "")
-                if "checkbox" in value_type.lower():
-                    vertices = self._get_normalized_vertices(
-                        field_value.get("boundingPoly")
-                    ) if field_value else []
+                if _is_checkbox_type(value_type):
+                    vertices = self._layout_vertices(field_value)
                     field_name = field.get("fieldName")
                     checkboxes.append({
                         "page": page_idx,
@@ -622,15 +937,17 @@ class DocumentAnalysisResult:
     # ------------------------------------------------------------------
 
     def get_paragraphs(self) -> List[Dict[str, Any]]:
-        """Get all paragraphs across all pages."""
+        """Get all paragraphs across all pages (cached)."""
+        return self._paragraphs
+
+    @cached_property
+    def _paragraphs(self) -> List[Dict[str, Any]]:
         paragraphs = []
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for para in page.get("paragraphs", []):
+        for page_idx, page in enumerate(self.document.get("pages", ())):
+            for para in page.get("paragraphs", ()):
                 layout = para.get("layout")
                 text = self._layout_to_text(layout)
-                vertices = self._get_normalized_vertices(
-                    layout.get("boundingPoly")
-                ) if layout else []
+                vertices = self._layout_vertices(layout)
                 paragraphs.append({
                     "page": page_idx,
                     "text": text,
@@ -653,6 +970,10 @@ class DocumentAnalysisResult:
         Returns:
             Dict with keys: text, tables, paragraphs, form_fields, entities, checkboxes
         """
+        return self._bounding_boxes
+
+    @cached_property
+    def _bounding_boxes(self) -> Dict[str, list]:
         bounding_boxes: Dict[str, list] = {
             "text": [],
             "tables": [],
@@ -662,17 +983,34 @@ class DocumentAnalysisResult:
             "checkboxes": [],
         }
 
-        # 1. Text lines
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for line in page.get("lines", []):
-                layout = line.get("layout")
-                if not layout:
+        # Bind the per-bucket appends and helpers once; the loop below can
+        # touch every element of a 100-page document.
+        text_boxes = bounding_boxes["text"].append
+        table_boxes = bounding_boxes["tables"].append
+        paragraph_boxes = bounding_boxes["paragraphs"].append
+        form_field_boxes = bounding_boxes["form_fields"].append
+        checkbox_boxes = bounding_boxes["checkboxes"].append
+        layout_to_text = self._layout_to_text
+        get_vertices = self._get_normalized_vertices
+        layout_vertices = self._layout_vertices
+
+        # One traversal fills every page-level bucket at once instead of
+        # re-walking the pages array per element type.
+        for page_idx, page in enumerate(self.document.get("pages", ())):
+            # Text lines. EAFP: elements without a layout/boundingPoly are
+            # the rare case, so pay for them in the except branch instead
+            # of two dict.get calls per element on the common path.
+            for line in page.get("lines", ()):
+                try:
+                    layout = line["layout"]
+                    poly = layout["boundingPoly"]
+                except (KeyError, TypeError):
                     continue
-                vertices = self._get_normalized_vertices(layout.get("boundingPoly"))
-                if not vertices:
+                vertices = get_vertices(poly)
+                if not len(vertices):
                     continue
-                text = self._layout_to_text(layout)
-                bounding_boxes["text"].append({
+                text = layout_to_text(layout)
+                text_boxes({
                     "page": page_idx,
                     "vertices": vertices,
                     "content": text,
@@ -680,14 +1018,15 @@ class DocumentAnalysisResult:
                     "confidence": layout.get("confidence", 0.0),
                 })
 
-        # 2. Tables
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for table in page.get("tables", []):
-                layout = table.get("layout")
-                if not layout:
+            # Tables
+            for table in page.get("tables", ()):
+                try:
+                    layout = table["layout"]
+                    poly = layout["boundingPoly"]
+                except (KeyError, TypeError):
                     continue
-                vertices = self._get_normalized_vertices(layout.get("boundingPoly"))
-                if not vertices:
+                vertices = get_vertices(poly)
+                if not len(vertices):
                     continue
                 header_rows = table.get("headerRows", [])
                 body_rows = table.get("bodyRows", [])
@@ -697,7 +1036,7 @@ class DocumentAnalysisResult:
                     col_count = len(body_rows[0].get("cells", []))
                 elif header_rows:
                     col_count = len(header_rows[0].get("cells", []))
-                bounding_boxes["tables"].append({
+                table_boxes({
                     "page": page_idx,
                     "vertices": vertices,
                     "content": f"Table ({row_count} rows x {col_count} cols)",
@@ -709,17 +1048,18 @@ class DocumentAnalysisResult:
                     },
                 })
 
-        # 3. Paragraphs
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for para in page.get("paragraphs", []):
-                layout = para.get("layout")
-                if not layout:
+            # Paragraphs
+            for para in page.get("paragraphs", ()):
+                try:
+                    layout = para["layout"]
+                    poly = layout["boundingPoly"]
+                except (KeyError, TypeError):
                     continue
-                vertices = self._get_normalized_vertices(layout.get("boundingPoly"))
-                if not vertices:
+                vertices = get_vertices(poly)
+                if not len(vertices):
                     continue
-                text = self._layout_to_text(layout)
-                bounding_boxes["paragraphs"].append({
+                text = layout_to_text(layout)
+                paragraph_boxes({
                     "page": page_idx,
                     "vertices": vertices,
                     "content": text[:100] + ("..." if len(text) > 100 else ""),
@@ -728,19 +1068,43 @@ class DocumentAnalysisResult:
                     "details": {"fullContent": text, "length": len(text)},
                 })
 
-        # 4. Form fields (key-value pairs)
-        for page_idx, page in enumerate(self.document.get("pages", [])):
-            for field in page.get("formFields", []):
+            # Selection marks (visual checkmarks)
+            for block in page.get("visualElements", ()):
+                block_type = block.get("type", "")
+                if block_type in _CHECKBOX_TYPES:
+                    layout = block.get("layout")
+                    vertices = layout_vertices(layout)
+                    if len(vertices):
+                        checkbox_boxes({
+                            "page": page_idx,
+                            "vertices": vertices,
+                            "content": _CB_CONTENT.get(block_type)
+                            or _CB_PREFIX + block_type,
+                            "type": "checkbox",
+                            "confidence": layout.get("confidence", 0.0) if layout else 0.0,
+                            "details": {
+                                "state": block_type,
+                                "key": "",
+                            },
+                        })
+
+            # Form fields (key-value pairs, plus checkbox-valued fields)
+            for field in page.get("formFields", ()):
                 field_name = field.get("fieldName")
                 field_value = field.get("fieldValue")
 
-                # Key bounding box
-                if field_name and field_name.get("boundingPoly"):
-                    key_vertices = self._get_normalized_vertices(field_name.get("boundingPoly"))
-                    key_text = self._layout_to_text(field_name)
-                    value_text = self._layout_to_text(field_value) if field_value else ""
-                    if key_vertices:
-                        bounding_boxes["form_fields"].append({
+                # Key/value text once per field; the key, value, and
+                # checkbox blocks below all reference both strings.
+                key_text = layout_to_text(field_name) if field_name else ""
+                value_text = layout_to_text(field_value) if field_value else ""
+
+                # Key bounding box. Fetch boundingPoly once and reuse it
+                # for both the guard and the vertex extraction.
+                key_poly = field_name.get("boundingPoly") if field_name else None
+                if key_poly:
+                    key_vertices = get_vertices(key_poly)
+                    if len(key_vertices):
+                        form_field_boxes({
                             "page": page_idx,
                             "vertices": key_vertices,
                             "content": f"Key: {key_text}",
@@ -753,12 +1117,11 @@ class DocumentAnalysisResult:
                             },
                         })
                 # Value bounding box
-                if field_value and field_value.get("boundingPoly"):
-                    value_vertices = self._get_normalized_vertices(field_value.get("boundingPoly"))
-                    key_text = self._layout_to_text(field_name) if field_name else ""
-                    value_text = self._layout_to_text(field_value)
-                    if value_vertices:
-                        bounding_boxes["form_fields"].append({
+                value_poly = field_value.get("boundingPoly") if field_value else None
+                if value_poly:
+                    value_vertices = get_vertices(value_poly)
+                    if len(value_vertices):
+                        form_field_boxes({
                             "page": page_idx,
                             "vertices": value_vertices,
                             "content": f"Value: {value_text}",
@@ -771,21 +1134,40 @@ class DocumentAnalysisResult:
                             },
                         })
 
-        # 5. Entities
-        for entity in self.document.get("entities", []):
+                # Checkbox-valued form fields
+                value_type = field_value.get("valueType", "") if field_value else ""
+                if _is_checkbox_type(value_type):
+                    vertices = get_vertices(value_poly)
+                    if len(vertices):
+                        checkbox_boxes({
+                            "page": page_idx,
+                            "vertices": vertices,
+                            "content": _CB_CONTENT.get(value_type)
+                            or _CB_PREFIX + value_type,
+                            "type": "checkbox",
+                            "confidence": field_value.get("confidence", 0.0),
+                            "details": {
+                                "state": value_type,
+                                "key": key_text,
+                            },
+                        })
+
+        # Entities (document-level, not per page)
+        entity_boxes = bounding_boxes["entities"].append
+        for entity in self.document.get("entities", ()):
             page_index = 0
-            vertices = []
+            vertices = _EMPTY_VERTICES
             page_anchor = entity.get("pageAnchor")
             if page_anchor:
                 page_refs = page_anchor.get("pageRefs", [])
                 if page_refs:
                     ref = page_refs[0]
-                    page_index = int(ref.get("page", 0))
+                    page_index = _as_int(ref.get("page"))
                     bp = ref.get("boundingPoly")
                     if bp:
                         vertices = self._get_normalized_vertices(bp)
 
-            if not vertices:
+            if not len(vertices):
                 continue
 
             normalized_value = ""
@@ -793,13 +1175,13 @@ class DocumentAnalysisResult:
             if nv:
                 normalized_value = nv.get("text", "")
 
-            entity_type = entity.get("type", "")
+            entity_type = sys.intern(entity.get("type", ""))
             mention_text = entity.get("mentionText", "")
 
-            bounding_boxes["entities"].append({
+            entity_boxes({
                 "page": page_index,
                 "vertices": vertices,
-                "content": f"{entity_type}: {mention_text}",
+                "content": entity_type + ": " + mention_text,
                 "type": "entity",
                 "confidence": entity.get("confidence", 0.0),
                 "details": {
@@ -809,21 +1191,6 @@ class DocumentAnalysisResult:
                 },
             })
 
-        # 6. Checkboxes
-        for cb in self.get_checkboxes():
-            if cb.get("vertices"):
-                bounding_boxes["checkboxes"].append({
-                    "page": cb["page"],
-                    "vertices": cb["vertices"],
-                    "content": f"Checkbox: {cb.get('state', 'unknown')}",
-                    "type": "checkbox",
-                    "confidence": cb.get("confidence", 0.0),
-                    "details": {
-                        "state": cb.get("state", "unknown"),
-                        "key": cb.get("key", ""),
-                    },
-                })
-
         return bounding_boxes
 
     # ------------------------------------------------------------------
@@ -832,6 +1199,10 @@ class DocumentAnalysisResult:
 
     def get_formatted_fields(self) -> Dict[str, Any]:
         """Get entities formatted for the Fields tab."""
+        return self._formatted_fields
+
+    @cached_property
+    def _formatted_fields(self) -> Dict[str, Any]:
         formatted: Dict[str, Any] = {}
 
         entities = self.get_entities()
@@ -867,12 +1238,28 @@ class DocumentAnalysisResult:
         """Return the document dict (already JSON-serializable)."""
         return self.document
 
+    def to_json_bytes(self) -> bytes:
+        """
+        Serialize the document to JSON bytes via orjson.
+
+        OPT_SERIALIZE_NUMPY lets callers serialize derived views that embed
+        float32 vertex arrays without converting them to lists first.
+        """
+        return orjson.dumps(self.document, option=orjson.OPT_SERIALIZE_NUMPY)
+
     # ------------------------------------------------------------------
     # Vertex helpers
     # ------------------------------------------------------------------
 
+    @classmethod
+    def _layout_vertices(cls, layout: Optional[Dict[str, Any]]) -> np.ndarray:
+        """Vertices for a layout-like dict's boundingPoly; empty if either is absent."""
+        if not layout:
+            return _EMPTY_VERTICES
+        return cls._get_normalized_vertices(layout.get("boundingPoly"))
+
     @staticmethod
-    def _get_normalized_vertices(bounding_poly: Optional[Dict[str, Any]]) -> List[Dict[str, float]]:
+    def _get_normalized_vertices(bounding_poly: Optional[Dict[str, Any]]) -> np.ndarray:
         """
         Extract normalized vertices from a boundingPoly dict.
 
@@ -880,17 +1267,18 @@ class DocumentAnalysisResult:
         Missing values default to 0.0.
 
         Returns:
-            List of {x, y} dicts (typically 4 vertices for a quadrilateral)
+            (N, 2) float32 array of [x, y] rows (typically 4 vertices for a
+            quadrilateral). Consumers scale all vertices to pixel space with
+            a single broadcast multiply instead of per-dict Python loops.
         """
         if not bounding_poly:
-            return []
-        vertices = []
-        for v in bounding_poly.get("normalizedVertices", []):
-            vertices.append({
-                "x": v.get("x", 0.0),
-                "y": v.get("y", 0.0),
-            })
-        return vertices
+            return _EMPTY_VERTICES
+        raw = bounding_poly.get("normalizedVertices", [])
+        if not raw:
+            return _EMPTY_VERTICES
+        return np.array(
+            [(v.get("x", 0.0), v.get("y", 0.0)) for v in raw], dtype=np.float32
+        )
 
 
 # ------------------------------------------------------------------
@@ -903,15 +1291,59 @@ _ADC_PATH = os.path.join(
 )
 
 
+# Parsed credential files keyed by path, validated by mtime;
+# create_client_from_env sits on the rerun path, and the file rarely
+# changes under a running app.
+_CRED_FILE_CACHE: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+
+
 def _load_cred_info_from_file(path: str) -> Optional[Dict[str, Any]]:
     """Load and parse a credential JSON file (service account or ADC)."""
     try:
-        with open(path) as f:
-            return json.load(f)
+        mtime = os.stat(path).st_mtime_ns
+        cached = _CRED_FILE_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with open(path, "rb") as f:
+            cred_info = orjson.loads(f.read())
+        _CRED_FILE_CACHE[path] = (mtime, cred_info)
+        return cred_info
     except Exception:
         return None
 
 
+# Successful secrets read, cached for the process. Misses are deliberately
+# not cached: Streamlit hot-reloads secrets.toml, and app.py clears its
+# client cache so credentials added after startup get picked up on a rerun.
+_SECRETS_CACHE: Optional[Tuple[str, Dict[str, Any]]] = None
+
+
+def _read_secrets() -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """
+    Read the endpoint and service-account blob from Streamlit secrets.
+
+    st.secrets goes through a locked singleton and dict() copies the whole
+    credential table, so a successful read is cached for the life of the
+    process; failed reads retry on the next call.
+
+    streamlit is imported lazily here — it is the only use in this module,
+    and deferring it keeps `import gcp_docai_client` fast for scripts and
+    tooling that only want the REST client.
+    """
+    global _SECRETS_CACHE
+    if _SECRETS_CACHE is not None:
+        return _SECRETS_CACHE
+    try:
+        import streamlit as st
+        endpoint = st.secrets.get("GCP_DOCAI_ENDPOINT")
+        if endpoint:
+            _SECRETS_CACHE = (endpoint, dict(st.secrets["gcp_service_account"]))
+            return _SECRETS_CACHE
+        return endpoint, None
+    except Exception:
+        return None, None
+
+
 def create_client_from_env() -> Optional[GCPDocumentAIClient]:
     """
     Create a GCP Document AI client from available configuration.
@@ -922,16 +1354,8 @@ def create_client_from_env() -> Optional[GCPDocumentAIClient]:
     3. GCP_DOCAI_ENDPOINT + Application Default Credentials (gcloud auth application-default login)
     4. None (caller should prompt for manual input)
     """
-    endpoint = None
-    cred_info = None
-
     # Try Streamlit secrets first
-    try:
-        endpoint = st.secrets.get("GCP_DOCAI_ENDPOINT")
-        if endpoint:
-            cred_info = dict(st.secrets["gcp_service_account"])
-    except Exception:
-        pass
+    endpoint, cred_info = _read_secrets()
 
     # Fall back to environment variables
     if not endpoint:
@@ -950,7 +1374,7 @@ def create_client_from_env() -> Optional[GCPDocumentAIClient]:
         try:
             return GCPDocumentAIClient(endpoint, cred_info)
         except Exception as e:
-            logger.error(f"Failed to create client from env: {e}")
+            logger.error("Failed to create client from env: %s", e)
             return None
 
     return None
@@ -6,14 +6,25 @@ import logging
 import os
 from typing import Optional
 
+# Set once per process. basicConfig(force=True) tears down and rebuilds
+# every handler, which Streamlit would otherwise re-trigger on each
+# script rerun through the module-level setup_logging() call in app.py.
+_CONFIGURED = False
+
 
 def setup_logging(level: Optional[str] = None) -> None:
     """
     Set up logging configuration for the entire application.
 
+    No-op after the first call unless an explicit level override is passed.
+
     Args:
         level: Optional logging level override (DEBUG, INFO, WARNING, ERROR)
     """
+    global _CONFIGURED
+    if _CONFIGURED and level is None:
+        return
+
     if level:
         log_level = getattr(logging, level.upper(), logging.INFO)
     else:
@@ -38,6 +49,8 @@ def setup_logging(level: Optional[str] = None) -> None:
     for logger_name, logger_level in loggers.items():
         logging.getLogger(logger_name).setLevel(logger_level)
 
+    _CONFIGURED = True
+
 
 def get_logger(name: str) -> logging.Logger:
     """
@@ -2,7 +2,7 @@
 Reusable Streamlit UI components for the GCP Document AI showcase.
 """
 
-import json
+import orjson
 from typing import Dict, List, Any, Optional
 
 import streamlit as st
@@ -21,6 +21,26 @@ from config import (
 # ------------------------------------------------------------------
 
 
+def _build_manual_options() -> tuple:
+    """Build the manual-input selector options once at import.
+
+    The processor catalog is fixed at runtime, so there is no reason to
+    re-walk the categories and re-resolve display names on every rerun.
+    """
+    categorized = get_processors_by_category()
+    options = []
+    option_to_type = {}
+    for category in PROCESSOR_CATEGORIES:
+        for proc_type in categorized.get(category, ()):
+            display_name = get_processor_display_name(proc_type)
+            options.append(display_name)
+            option_to_type[display_name] = proc_type
+    return options, option_to_type
+
+
+_MANUAL_OPTIONS, _MANUAL_OPTION_TO_TYPE = _build_manual_options()
+
+
 class ProcessorSelector:
     """Component for selecting a Document AI processor."""
 
@@ -73,25 +93,14 @@ class ProcessorSelector:
     @staticmethod
     def _render_manual_input() -> Optional[Dict[str, Any]]:
         """Render manual processor ID input with processor type hint."""
-        # Processor type hint dropdown
-        categorized = get_processors_by_category()
-        options = []
-        option_to_type = {}
-
-        for category in PROCESSOR_CATEGORIES:
-            if category in categorized:
-                for proc_type in categorized[category]:
-                    display_name = get_processor_display_name(proc_type)
-                    options.append(display_name)
-                    option_to_type[display_name] = proc_type
-
+        # Processor type hint dropdown (precomputed at import)
         selected_type_label = st.sidebar.selectbox(
             "Processor type (reference):",
-            options,
+            _MANUAL_OPTIONS,
             help="Select the type of processor you want to use. You still need to provide the processor ID below.",
         )
 
-        selected_type = option_to_type.get(selected_type_label)
+        selected_type = _MANUAL_OPTION_TO_TYPE.get(selected_type_label)
         if selected_type:
             ProcessorSelector._render_processor_info(selected_type)
 
@@ -120,12 +129,12 @@ class ProcessorSelector:
             return
 
         with st.sidebar.expander("Processor Information", expanded=False):
-            st.write(f"**Name:** {info['name']}")
-            st.write(f"**Description:** {info['description']}")
-            st.write(f"**Category:** {info['category']}")
-            st.write(f"**Max Pages (online):** {info['max_pages_online']}")
-            st.write(f"**Entity Extraction:** {'Yes' if info['entity_extraction'] else 'No'}")
-            st.write(f"**Capabilities:** {', '.join(info['capabilities'])}")
+            st.write(f"**Name:** {info.name}")
+            st.write(f"**Description:** {info.description}")
+            st.write(f"**Category:** {info.category}")
+            st.write(f"**Max Pages (online):** {info.max_pages_online}")
+            st.write(f"**Entity Extraction:** {'Yes' if info.entity_extraction else 'No'}")
+            st.write(f"**Capabilities:** {', '.join(info.capabilities)}")
 
     @staticmethod
     def _render_processor_info_from_discovered(proc: Dict[str, Any]):
@@ -138,9 +147,9 @@ class ProcessorSelector:
             # Show additional info from our config if available
             info = get_processor_info(proc["type"])
             if info:
-                st.write(f"**Description:** {info['description']}")
-                st.write(f"**Max Pages (online):** {info['max_pages_online']}")
-                st.write(f"**Entity Extraction:** {'Yes' if info['entity_extraction'] else 'No'}")
+                st.write(f"**Description:** {info.description}")
+                st.write(f"**Max Pages (online):** {info.max_pages_online}")
+                st.write(f"**Entity Extraction:** {'Yes' if info.entity_extraction else 'No'}")
 
 
 # ------------------------------------------------------------------
@@ -430,7 +439,31 @@ class ResultsDisplay:
                         data = all_rows
 
                     try:
-                        df = pd.DataFrame(data, columns=headers[:len(data[0])] if data else headers)
+                        if data:
+                            # Columnar construction: a dict of columns lets
+                            # pandas build each column in one pass instead of
+                            # running type inference row by row. Ragged rows
+                            # (zip would truncate to the shortest) and
+                            # duplicate header names (dict keys would
+                            # collapse) keep the NaN-padding row-wise path.
+                            row_len = len(data[0])
+                            uniform = all(len(row) == row_len for row in data)
+                            names = headers[:row_len]
+                            # Body rows can be wider than the header row;
+                            # pad with generated labels so zip does not
+                            # drop the extra data columns.
+                            names += [
+                                f"Col {j+1}" for j in range(len(names), row_len)
+                            ]
+                            if uniform and len(set(names)) == len(names):
+                                cols = zip(*data)
+                                df = pd.DataFrame(
+                                    {n: list(c) for n, c in zip(names, cols)}
+                                )
+                            else:
+                                df = pd.DataFrame(data, columns=names)
+                        else:
+                            df = pd.DataFrame(columns=headers)
                         st.dataframe(df, use_container_width=True)
                     except Exception:
                         # Fall back to plain display
@@ -481,19 +514,23 @@ class ResultsDisplay:
     @staticmethod
     def _render_json_view(raw_dict: Dict[str, Any]):
         """Render the raw JSON response."""
-        json_str = json.dumps(raw_dict, indent=2, ensure_ascii=False)
+        # orjson serializes multi-MB responses several times faster than the
+        # stdlib and emits UTF-8 bytes the download button takes directly.
+        json_bytes = orjson.dumps(raw_dict, option=orjson.OPT_INDENT_2)
 
         col1, col2 = st.columns([3, 1])
         with col2:
             st.download_button(
                 "Download JSON",
-                data=json_str,
+                data=json_bytes,
                 file_name="analysis_result.json",
                 mime="application/json",
             )
 
         st.markdown("### Raw Analysis Result")
-        st.json(raw_dict)
+        # Hand st.json the pre-serialized string so Streamlit does not
+        # re-serialize the dict through stdlib json a second time.
+        st.json(json_bytes.decode())
 
 
 # ------------------------------------------------------------------